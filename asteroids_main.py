@@ -2,26 +2,421 @@
 # ASTEROIDS
 #   A game for Rapsberry Pi PICO/PICO W with Pico Display (PIMORONI)
 #     - Rapsberry Pi PICO or PICO W
-#     - Pico Display (PIMORONI)
+#     - Pico Display or Pico Display 2.0 (PIMORONI), set DISPLAY_PROFILE
 #     - micropython 1.20
 #   Copyright 2023, Shunsuke Ohira
 '''''''''
 
 import time
 from pimoroni import Button
-from picographics import PicoGraphics, DISPLAY_PICO_DISPLAY, PEN_P4
+from picographics import PicoGraphics, DISPLAY_PICO_DISPLAY, DISPLAY_PICO_DISPLAY_2, PEN_P4
 
 import machine, _thread
 import random
+import struct, os
+import gc, binascii
+from array import array
+
+try:
+    from picographics import get_buffer_size
+except ImportError:
+    get_buffer_size = None
+
+try:
+    import framebuf
+except ImportError:
+    framebuf = None
+
+try:
+    import uasyncio as asyncio
+except ImportError:
+    import asyncio
+
+# Millisecond ticks (MicroPython), or its substitute
+try:
+    ticks_ms = time.ticks_ms
+    ticks_diff = time.ticks_diff
+except AttributeError:
+    ticks_ms = lambda: int(time.monotonic() * 1000)
+    ticks_diff = lambda new, old: new - old
+
+# Free heap bytes (MicroPython), or None
+def mem_free():
+    try:
+        return gc.mem_free()
+    except AttributeError:
+        return None
+
+DISPLAY_PROFILE = DISPLAY_PICO_DISPLAY   # DISPLAY_PICO_DISPLAY (240x135) or DISPLAY_PICO_DISPLAY_2 (320x240)
+BAND_HEIGHT = 0                          # 0: Full frame buffer of PicoGraphics, >0: Band renderer with strips of this height
+
+# Screen layout for each display, text positions are (x, y, scale)
+LAYOUTS = {
+    DISPLAY_PICO_DISPLAY: {
+        "name": "PICO DISPLAY",
+        "size": (240, 135),
+        "title_height": 20,              # STAGE, LEFT, SCORE dispay area
+        "header_scale": 2,
+        "logo": (3, 0, 4),
+        "help_up": (15, 30, 3),
+        "help_down": (15, 57, 3),
+        "help_fire": (15, 84, 3),
+        "play": (15, 111, 3),
+        "game_over": (15, 20, 5),
+        "game_clear": (0, 20, 5),
+        "high_score": (22, 67, 4),
+        "high_sc": (15, 73, 3),
+        "replay": (65, 111, 3),
+        "banner": (12, 50, 4)
+    },
+    DISPLAY_PICO_DISPLAY_2: {
+        "name": "PICO DISPLAY 2.0",
+        "size": (320, 240),
+        "title_height": 20,
+        "header_scale": 2,
+        "logo": (5, 20, 4),
+        "help_up": (20, 70, 3),
+        "help_down": (20, 105, 3),
+        "help_fire": (20, 140, 3),
+        "play": (20, 190, 3),
+        "game_over": (25, 40, 5),
+        "game_clear": (10, 40, 5),
+        "high_score": (16, 115, 4),
+        "high_sc": (40, 120, 3),
+        "replay": (90, 185, 3),
+        "banner": (55, 105, 4)
+    }
+}
+'''
+# ST7789 band output class, writes a band of the band renderer to the LCD through SPI
+#    The LCD is initialized in the same way as the Pimoroni ST7789 driver (RGB565, landscape).
+#    set_palette() makes a 16x1 RGB565 palette framebuf of the pens (byte swapped for the LCD).
+#    write() sends a band converting it line by line with framebuf blit() and the palette, in C without allocations.
+'''
+class St7789_band_sink_class:
+    # Column and row offsets, MADCTL for each display size
+    PANELS = {(240, 135): (40, 53, 0x70), (320, 240): (0, 0, 0x70)}
+
+    def __init__(self, width, height):
+        self.width = width
+        self.x_offset, self.y_offset, madctl = St7789_band_sink_class.PANELS[(width, height)]
+        self.line = bytearray(width * 2)                 # RGB565 line buffer
+        self.line_fb = framebuf.FrameBuffer(self.line, width, 1, framebuf.RGB565)
+        self.palette = bytearray(16 * 2)                 # PEN_P4 -> RGB565
+        self.palette_fb = framebuf.FrameBuffer(self.palette, 16, 1, framebuf.RGB565)
+
+        self.spi = machine.SPI(0, baudrate=62500000, sck=machine.Pin(18), mosi=machine.Pin(19))
+        self.cs = machine.Pin(17, machine.Pin.OUT, value=1)
+        self.dc = machine.Pin(16, machine.Pin.OUT, value=1)
+        self.backlight = machine.PWM(machine.Pin(20))
+        self.backlight.freq(500)
+
+        self.command(0x01)                               # SWRESET
+        time.sleep(0.15)
+        self.command(0x35)                               # TEON
+        self.command(0x3a, b"\x05")                      # COLMOD: 16 bits per pixel
+        self.command(0xb2, b"\x0c\x0c\x00\x33\x33")      # PORCTRL
+        self.command(0xb7, b"\x35")                      # GCTRL
+        self.command(0xbb, b"\x1f")                      # VCOMS
+        self.command(0xc0, b"\x2c")                      # LCMCTRL
+        self.command(0xc2, b"\x01")                      # VDVVRHEN
+        self.command(0xc3, b"\x12")                      # VRHS
+        self.command(0xc4, b"\x20")                      # VDVS
+        self.command(0xc6, b"\x0f")                      # FRCTRL2
+        self.command(0xd0, b"\xa4\xa1")                  # PWCTRL1
+        self.command(0x21)                               # INVON
+        self.command(0x11)                               # SLPOUT
+        self.command(0x29)                               # DISPON
+        time.sleep(0.1)
+        self.command(0x36, bytes([madctl]))              # MADCTL
+
+    # Send a command and its data
+    def command(self, cmd, data = None):
+        self.cs.value(0)
+        self.dc.value(0)
+        self.spi.write(bytes([cmd]))
+        if data is not None:
+            self.dc.value(1)
+            self.spi.write(data)
+        self.cs.value(1)
+
+    # Backlight brightness (0.0..1.0)
+    def set_backlight(self, brightness):
+        self.backlight.duty_u16(int(brightness * 65535))
+
+    # Make the palette framebuf from the pens (list of RGB565)
+    def set_palette(self, palette):
+        for pen in range(min(len(palette), 16)):
+            c = palette[pen]
+            self.palette_fb.pixel(pen, 0, ((c & 0xff) << 8) | (c >> 8))     # The LCD takes the high byte first
+
+    # Send a band
+    #   y: Top of the band, h: Height of the band, band: Band framebuf (PEN_P4)
+    def write(self, y, h, band):
+        x1 = self.x_offset
+        x2 = x1 + self.width - 1
+        y1 = self.y_offset + y
+        y2 = y1 + h - 1
+        self.command(0x2a, bytes([x1 >> 8, x1 & 0xff, x2 >> 8, x2 & 0xff]))     # CASET
+        self.command(0x2b, bytes([y1 >> 8, y1 & 0xff, y2 >> 8, y2 & 0xff]))     # RASET
+        self.command(0x2c)                                                       # RAMWR
+
+        self.cs.value(0)
+        self.dc.value(1)
+        for row in range(h):
+            self.line_fb.blit(band, 0, -row, -1, self.palette_fb)
+            self.spi.write(self.line)
+        self.cs.value(1)
+
+    # Bytes allocated for the output
+    def buffer_bytes(self):
+        return len(self.line) + len(self.palette)
+
+########### END OF St7789_band_sink_class ###########
+
+'''
+# Band renderer class, the display object when BAND_HEIGHT > 0
+#    Works as PicoGraphics for the game, but has no full frame buffer.
+#    The drawing calls in a frame are recorded in a display list with their vertical ranges.
+#    The display list is a preallocated array of OP_SIZE shorts per call (kind, pen, y1, y2, 6 arguments),
+#    texts are referred from a list of the same capacity, both grow only when a frame has more calls.
+#    update() composes the frame band by band into a small reusable band buffer (framebuf, PEN_P4),
+#    replaying only the calls intersecting each band on the background, then sends the band to the LCD.
+#    Every frame is redrawn completely (FULL_REDRAW), so the objects never rely on the previous frame.
+#    keep_scene() keeps the calls of the last frame under the next frames until clear(), for the banners.
+#    The texts are drawn with the framebuf 8x8 font scaled to the bitmap8 glyph width (6 pixels x scale), no word wrap.
+'''
+class Band_renderer_class:
+    CLEAR = 0
+    PIXEL = 1
+    SPAN = 2
+    RECTANGLE = 3
+    CIRCLE = 4
+    TRIANGLE = 5
+    TEXT = 6
+    OP_SIZE = 10
+    OPS_INIT = 96                          # Initial capacity of the display list (calls in a frame)
+
+    def __init__(self, width, height, band_height, sink):
+        self.width = width
+        self.height = height
+        self.band_height = band_height
+        self.sink = sink
+        self.buf = bytearray(width * band_height // 2)
+        self.band = framebuf.FrameBuffer(self.buf, width, band_height, framebuf.GS4_HMSB)
+        self.glyph_buf = bytearray(8)
+        self.glyph_fb = framebuf.FrameBuffer(self.glyph_buf, 8, 8, framebuf.MONO_HLSB)
+        self.glyphs = {}                   # Character: 8 bytes of 8x8 font
+        self.coords = array("h", [0] * 6)  # Triangle vertices for poly()
+        self.palette = []                  # RGB565 of the pens
+        self.background = 0
+        self.pen = 0
+        self.ops = array("h", [0] * (Band_renderer_class.OPS_INIT * Band_renderer_class.OP_SIZE))
+        self.texts = [None] * Band_renderer_class.OPS_INIT
+        self.n = 0                         # Calls in the display list
+        self.last_n = 0                    # Calls of the last frame
+        self.base = 0                      # Calls kept under the frames (keep_scene())
+        self.n_peak = 0                    # Peak calls in a frame
+
+    def get_bounds(self):
+        return self.width, self.height
+
+    def set_backlight(self, brightness):
+        self.sink.set_backlight(brightness)
+
+    def set_font(self, font):
+        pass
+
+    def create_pen(self, r, g, b):
+        pen = len(self.palette)
+        self.palette.append(((r & 0xf8) << 8) | ((g & 0xfc) << 3) | (b >> 3))
+        if r == 0 and g == 0 and b == 0 and pen > 0 and self.palette[self.background] != 0:
+            self.background = pen
+        self.sink.set_palette(self.palette)
+        return pen
+
+    def set_pen(self, pen):
+        self.pen = pen
+
+    # Record a call in the display list
+    def record(self, kind, y1, y2, a0 = 0, a1 = 0, a2 = 0, a3 = 0, a4 = 0, a5 = 0):
+        if self.n == len(self.texts):
+            self.ops.extend(array("h", [0] * len(self.ops)))
+            self.texts.extend([None] * len(self.texts))
+
+        ops = self.ops
+        i = self.n * Band_renderer_class.OP_SIZE
+        ops[i] = kind
+        ops[i + 1] = self.pen
+        ops[i + 2] = y1
+        ops[i + 3] = y2
+        ops[i + 4] = a0
+        ops[i + 5] = a1
+        ops[i + 6] = a2
+        ops[i + 7] = a3
+        ops[i + 8] = a4
+        ops[i + 9] = a5
+        self.n += 1
+
+    # The calls before clear() are never seen
+    def clear(self):
+        self.n = 0
+        self.base = 0
+        self.record(Band_renderer_class.CLEAR, 0, self.height)
+
+    def pixel(self, x, y):
+        self.record(Band_renderer_class.PIXEL, y, y + 1, x, y)
+
+    def pixel_span(self, x, y, l):
+        self.record(Band_renderer_class.SPAN, y, y + 1, x, y, l)
+
+    def rectangle(self, x, y, w, h):
+        self.record(Band_renderer_class.RECTANGLE, y, y + h, x, y, w, h)
+
+    def circle(self, x, y, r):
+        self.record(Band_renderer_class.CIRCLE, y - r, y + r + 1, x, y, r)
+
+    def triangle(self, x1, y1, x2, y2, x3, y3):
+        self.record(Band_renderer_class.TRIANGLE, min(y1, y2, y3), max(y1, y2, y3) + 1, x1, y1, x2, y2, x3, y3)
+
+    def text(self, text, x, y, wordwrap = 0, scale = 1, *args):
+        self.texts[self.n] = text
+        self.record(Band_renderer_class.TEXT, y, y + 8 * scale, x, y, scale)
+
+    def measure_text(self, text, scale = 1, *args):
+        return len(text) * 6 * scale
+
+    # Keep the calls of the last frame under the next frames until clear() (the scene under a banner)
+    #   Call this before drawing anything of the next frame.
+    def keep_scene(self):
+        self.base = self.last_n
+        self.n = self.base
+
+    # 8x8 font of a character
+    def glyph(self, ch):
+        g = self.glyphs.get(ch)
+        if g is None:
+            self.glyph_fb.fill(0)
+            self.glyph_fb.text(ch, 0, 0, 1)
+            g = bytes(self.glyph_buf)
+            self.glyphs[ch] = g
+        return g
+
+    # Draw a text in the band whose top is band_y
+    def draw_text(self, text, x, y, scale, pen, band_y, h):
+        fb = self.band
+        cw = max(1, 6 * scale // 8)                # Column width to fit 8 columns in the bitmap8 glyph width
+        for ch in text:
+            if x >= self.width:
+                break
+            g = self.glyph(ch)
+            for row in range(8):
+                top = y + row * scale - band_y
+                if top + scale <= 0 or top >= h:
+                    continue
+                bits = g[row]
+                for col in range(8):
+                    if bits & (0x80 >> col):
+                        fb.fill_rect(x + col * cw, top, cw, scale, pen)
+            x += 6 * scale
+
+    # Compose and send the frame band by band
+    def update(self):
+        ops = self.ops
+        fb = self.band
+        coords = self.coords
+        n = self.n
+        for band_y in range(0, self.height, self.band_height):
+            h = min(self.band_height, self.height - band_y)
+            band_y2 = band_y + h
+            fb.fill(self.background)
+            for i in range(0, n * Band_renderer_class.OP_SIZE, Band_renderer_class.OP_SIZE):
+                if ops[i + 3] <= band_y or ops[i + 2] >= band_y2:
+                    continue
+
+                kind = ops[i]
+                pen = ops[i + 1]
+                if kind == Band_renderer_class.PIXEL:
+                    fb.pixel(ops[i + 4], ops[i + 5] - band_y, pen)
+                elif kind == Band_renderer_class.SPAN:
+                    fb.hline(ops[i + 4], ops[i + 5] - band_y, ops[i + 6], pen)
+                elif kind == Band_renderer_class.CIRCLE:
+                    fb.ellipse(ops[i + 4], ops[i + 5] - band_y, ops[i + 6], ops[i + 6], pen, True)
+                elif kind == Band_renderer_class.TRIANGLE:
+                    for j in range(6):
+                        coords[j] = ops[i + 4 + j]
+                    fb.poly(0, -band_y, coords, pen, True)
+                elif kind == Band_renderer_class.RECTANGLE:
+                    fb.fill_rect(ops[i + 4], ops[i + 5] - band_y, ops[i + 6], ops[i + 7], pen)
+                elif kind == Band_renderer_class.TEXT:
+                    self.draw_text(self.texts[i // Band_renderer_class.OP_SIZE], ops[i + 4], ops[i + 5], ops[i + 6], pen, band_y, h)
+                else:
+                    fb.fill(pen)
+
+            self.sink.write(band_y, h, fb)
+
+        if n > self.n_peak:
+            self.n_peak = n
+        self.last_n = n
+        self.n = self.base
 
-# We're only using a few colors so we can use a 4 bit/16 colour palette and save RAM!
-display = PicoGraphics(display=DISPLAY_PICO_DISPLAY, pen_type=PEN_P4, rotate=0)
+    # Bytes of the display list (the text strings are owned by the game)
+    def display_list_bytes(self):
+        return len(self.ops) * self.ops.itemsize + len(self.texts) * 4
 
-WIDTH, HEIGHT = display.get_bounds()     # LCD size
-TITLE_HEIGHT = 20                        # STAGE, LEFT, SCORE dispay area
+    # Bytes allocated for the band, the display list and the output instead of the frame buffer
+    def buffer_bytes(self):
+        return len(self.buf) + len(self.glyph_buf) + len(self.coords) * 2 + self.display_list_bytes() + self.sink.buffer_bytes()
 
-display.set_backlight(0.5)
-display.set_font("bitmap8")
+########### END OF Band_renderer_class ###########
+
+'''
+# Set up the display object, its size, layout and pens
+#   profile: DISPLAY_PICO_DISPLAY or DISPLAY_PICO_DISPLAY_2
+#   band_height: 0 for the full frame buffer, or the band height of the band renderer
+'''
+def setup_display(profile, band_height = 0):
+    global display, DISPLAY_PROFILE, BAND_HEIGHT, FULL_REDRAW, LAYOUT, WIDTH, HEIGHT, TITLE_HEIGHT, DISPLAY_BUFFER_BYTES
+    global WHITE, BLACK, CYAN, MAGENTA, YELLOW, GREEN, RED, GARNET, BLUE
+    display = None
+    gc.collect()
+
+    DISPLAY_PROFILE = profile
+    BAND_HEIGHT = band_height
+    FULL_REDRAW = band_height > 0            # Every frame is drawn from scratch
+    LAYOUT = LAYOUTS[profile]
+
+    if band_height > 0:
+        width, height = LAYOUT["size"]
+        display = Band_renderer_class(width, height, band_height, St7789_band_sink_class(width, height))
+        DISPLAY_BUFFER_BYTES = display.buffer_bytes()
+    # We're only using a few colors so we can use a 4 bit/16 colour palette and save RAM!
+    elif get_buffer_size is not None:
+        frame_buffer = bytearray(get_buffer_size(profile, PEN_P4))
+        display = PicoGraphics(display=profile, pen_type=PEN_P4, rotate=0, buffer=frame_buffer)
+        DISPLAY_BUFFER_BYTES = len(frame_buffer)
+    else:
+        display = PicoGraphics(display=profile, pen_type=PEN_P4, rotate=0)
+        DISPLAY_BUFFER_BYTES = LAYOUT["size"][0] * LAYOUT["size"][1] // 2
+
+    WIDTH, HEIGHT = display.get_bounds()     # LCD size
+    TITLE_HEIGHT = LAYOUT["title_height"]    # STAGE, LEFT, SCORE dispay area
+
+    display.set_backlight(0.5)
+    display.set_font("bitmap8")
+
+    # Color definitions
+    WHITE = display.create_pen(255, 255, 255)
+    BLACK = display.create_pen(0, 0, 0)
+    CYAN = display.create_pen(0, 255, 255)
+    MAGENTA = display.create_pen(255, 0, 255)
+    YELLOW = display.create_pen(255, 255, 0)
+    GREEN = display.create_pen(0, 255, 0)
+    RED = display.create_pen(255, 0, 0)
+    GARNET = display.create_pen(255, 64, 64)
+    BLUE = display.create_pen(80, 128, 255)
+
+setup_display(DISPLAY_PROFILE, BAND_HEIGHT)
 
 # Button GPIO
 button_a = Button(12)
@@ -29,17 +424,6 @@ button_b = Button(13)
 button_x = Button(14)
 button_y = Button(15)
 
-# Color definitions
-WHITE = display.create_pen(255, 255, 255)
-BLACK = display.create_pen(0, 0, 0)
-CYAN = display.create_pen(0, 255, 255)
-MAGENTA = display.create_pen(255, 0, 255)
-YELLOW = display.create_pen(255, 255, 0)
-GREEN = display.create_pen(0, 255, 0)
-RED = display.create_pen(255, 0, 0)
-GARNET = display.create_pen(255, 64, 64)
-BLUE = display.create_pen(80, 128, 255)
-
 FINAL_STAGE = 9                      # Final stage number (game clear)
 SHIPS_INIT = 3                       # Initial number of player's space crafts
 MISSILE_MAX = 3                      # Maximum number of missiles on screen
@@ -60,6 +444,58 @@ ENEMY_NORMAL = 0                     # Asteroid (RED circle)
 ENEMY_UPGRADE_MISSILE = 1            # Enemy ship to upgrade player's missile (GREEN)
 ENEMY_ADD_SHIP = 2                   # Enemy ship to add a player's space craft (YELLOW)
 
+SNAPSHOT_FILE = "asteroids.sav"      # Suspended game file on the flash
+SNAPSHOT_MAGIC = b"ASTR"             # Snapshot file signature
+SNAPSHOT_VERSION = 2                 # Snapshot layout version, increment when the layout changes
+
+INPUT_PERIOD = 0.02                  # Main-core task periods (sec): Button polling
+PERSIST_PERIOD = 0.1                 #   Deferred flash writes
+HOUSEKEEPING_PERIOD = 1              #   Garbage collection
+STATS_PERIOD = 10                    #   Statistics print
+
+WATCHDOG_PERIOD = 0.1               #   Heartbeat monitor
+STALL_MS = 200                       # Heartbeat stall to record as an incident (msec)
+WDT_TIMEOUT = 0                      # Hardware watchdog timeout (msec), 0: disabled
+                                     #   An rp2 WDT can not be stopped once started: with e.g. 5000, breaking into the REPL
+                                     #   (Ctrl-C, to run draw_cost_gate() or display_benchmarks()) resets the board in 5 sec.
+INCIDENT_FILE = "asteroids.inc"      # Incident ring buffer file on the flash
+INCIDENT_MAX = 8                     # Number of incidents in the ring buffer
+INCIDENT_SAVE_INTERVAL = 2000        # Minimum interval of the incident writes to the flash (msec)
+WORKER_RESTART_MAX = 5               # Worker restarts after exceptions without any frame, then leave it to the watchdog
+WORKER_RESTART_WAIT = 200            # Wait before restarting the worker (msec), doubled on each restart without any frame
+INCIDENT_STALL = 1                   # Incident types: Heartbeat stalled
+INCIDENT_ERROR = 2                   #   Worker raised an exception
+INCIDENT_WDT_RESET = 3               #   Reset by the watchdog
+WORKER_PHASES = ["IDLE", "TITLE", "COLLISION", "PLAY", "STAGE_CLEAR", "DESTROYED", "GAME_OVER", "UPDATE"]   # Phases of draw_display()
+
+LATENCY_BUTTONS = ["A", "B", "Y"]    # Buttons to measure input-to-photon latency (A: up, B: down, Y: fire)
+LATENCY_PINS = [12, 13, 15]          # GPIO of LATENCY_BUTTONS, their falling edges are stamped by IRQ
+LATENCY_BUCKETS = [20, 40, 60, 80, 100, 150, 200, 500]   # Latency histogram bucket upper bounds (msec), and one more bucket over them
+
+# Draw cost regression gate (see draw_cost_gate())
+#   Measured draw operations per frame in each scene for each display: the peak in a frame and the mean per frame.
+#   The gate allows DRAW_COST_HEADROOM percent over the measured counts, rounded up to a whole count,
+#   for the different random sequences of MicroPython.  Re-measure with draw_cost_gate() when the drawing changes.
+DRAW_COST_HEADROOM = 20
+DRAW_COST_BASELINES = {
+    DISPLAY_PICO_DISPLAY: {
+        "TITLE"    : {"peak": {"pixel": 15, "text": 5, "set_pen": 14, "pixels": 29865, "glyphs": 59},
+                      "mean": {"pixel": 11.4, "text": 0.1, "set_pen": 11.2, "pixels": 608.5, "glyphs": 1.2}},
+        "PLAY"     : {"peak": {"pixel": 40, "pixel_span": 6, "rectangle": 6, "circle": 20, "triangle": 6, "text": 2, "set_pen": 61, "pixels": 13164, "glyphs": 46},
+                      "mean": {"pixel": 39.9, "pixel_span": 5.2, "rectangle": 6.0, "circle": 13.6, "triangle": 2.7, "text": 2.0, "set_pen": 57.4, "pixels": 10323.0, "glyphs": 44.7}},
+        "GAME_OVER": {"peak": {"pixel": 20, "circle": 10, "text": 5, "set_pen": 32, "pixels": 27437, "glyphs": 69},
+                      "mean": {"pixel": 13.4, "circle": 9.0, "text": 4.2, "set_pen": 24.2, "pixels": 21946.5, "glyphs": 62.1}}
+    },
+    DISPLAY_PICO_DISPLAY_2: {
+        "TITLE"    : {"peak": {"pixel": 22, "text": 5, "set_pen": 25, "pixels": 29878, "glyphs": 59},
+                      "mean": {"pixel": 17.8, "text": 0.1, "set_pen": 17.5, "pixels": 614.9, "glyphs": 1.2}},
+        "PLAY"     : {"peak": {"pixel": 40, "pixel_span": 6, "rectangle": 6, "circle": 16, "triangle": 4, "text": 2, "set_pen": 60, "pixels": 10384, "glyphs": 46},
+                      "mean": {"pixel": 39.9, "pixel_span": 5.3, "rectangle": 6.0, "circle": 14.1, "triangle": 2.2, "text": 2.0, "set_pen": 57.8, "pixels": 10227.9, "glyphs": 45.7}},
+        "GAME_OVER": {"peak": {"pixel": 32, "circle": 10, "triangle": 2, "text": 5, "set_pen": 43, "pixels": 26824, "glyphs": 69},
+                      "mean": {"pixel": 26.9, "circle": 8.4, "triangle": 1.0, "text": 3.1, "set_pen": 37.2, "pixels": 16301.6, "glyphs": 52.0}}
+    }
+}
+
 '''
 # Multi-core control class
 #    __init__() or __init__(True) starts multi-core.
@@ -70,6 +506,10 @@ ENEMY_ADD_SHIP = 2                   # Enemy ship to add a player's space craft
 #    worker_set() sets both a worker function and its arguments as a tuple.
 #    worker_start() starts the function set by worker_set().
 #    worker_stop() stops the function working.
+#    worker_pause() stops the function working and waits for it to return.
+#    beat() advances the heartbeat, the worker calls this every frame.
+#    set_phase() tells the phase of the worker to the monitor on core0.
+#    wait() sleeps with the heartbeat advancing.
 '''
 class Multi_core_class:
     def __init__(self, turn_on = True):
@@ -79,6 +519,9 @@ class Multi_core_class:
         self.worker_args = ()
         self.worker_run = False
         self.func_run = False
+        self.heartbeat = 0                 # Frame counter published by the worker
+        self.phase = "IDLE"                # Phase of the worker
+        self.worker_error = None           # Exception raised by the worker, the worker stops
         
         if turn_on:
             self.start_multi_core()
@@ -108,7 +551,12 @@ class Multi_core_class:
         while True:
             if self.worker_run:
                 self.func_run = True
-                self.worker_func(*self.worker_args)    # Extends the arguments tuple
+                try:
+                    self.worker_func(*self.worker_args)    # Extends the arguments tuple
+                except Exception as e:
+                    print("WORKER ERROR IN " + self.phase + ":", e)
+                    self.worker_error = e
+                    self.worker_run = False
                 self.func_run = False
 
     '''
@@ -129,14 +577,7 @@ class Multi_core_class:
     '''
     def worker_set(self, name, func, args):
         # Wait for current working function if it exists
-        run = False
-        if self.worker_run:
-            run = True
-            self.worker_stop()
-
-        # Wait for current working function if it exists
-        while self.func_run:
-            time.sleep(0.05)
+        run = self.worker_pause()
 
         # Change function and arguments
         self.worker_name = name
@@ -162,8 +603,196 @@ class Multi_core_class:
     def worker_stop(self):
         self.worker_run = False
 
+    '''
+    # Stop worker and wait for the working function to return
+    #   RETURN: bool: Worker had been started or not (give it to worker_start() to resume)
+    '''
+    def worker_pause(self):
+        run = self.worker_run
+        self.worker_stop()
+        while self.func_run:
+            time.sleep(0.005)
+        return run
+
+    '''
+    # Advance the heartbeat
+    '''
+    def beat(self):
+        self.heartbeat += 1
+
+    '''
+    # Set the worker phase
+    #   phase: One of WORKER_PHASES
+    '''
+    def set_phase(self, phase):
+        self.phase = phase
+
+    '''
+    # Sleep with the heartbeat advancing, for a long wait in the worker
+    #   sec: Seconds to sleep
+    '''
+    def wait(self, sec):
+        for i in range(int(sec * 10)):
+            time.sleep(0.1)
+            self.beat()
+
 ########### END OF Multi_core_class ###########
 
+'''
+# Input-to-photon latency class
+#    attach() stamps the falling edge of every button by a pin IRQ, edge() takes the stamp of a press in the poll,
+#    so the latency includes the polling delay (INPUT_PERIOD).  An edge older than two polls is stale (a tap
+#    the poll has missed), the poll time is used instead.
+#    press() records a button input with the tick of edge(), after the input has changed the game.
+#    drawn() is called by core1 before drawing the battle ship, the stamped inputs will be drawn in this frame.
+#    shown() is called by core1 after display.update(), the drawn inputs are recorded in the histograms.
+#    A stamp is kept until it is shown, so repeated inputs of a held button are measured from the oldest one.
+#    report() returns the histograms as a string.
+'''
+class Input_latency_class:
+    def __init__(self):
+        n = len(LATENCY_BUTTONS)
+        self.edges = [-1] * n              # Tick of the last falling edge not taken yet (-1: none)
+        self.pressed = [-1] * n            # Tick of the oldest input not drawn yet (-1: none)
+        self.drawing = [-1] * n            # Tick of the oldest input drawn in the framebuffer
+        self.histogram = [[0] * (len(LATENCY_BUCKETS) + 1) for i in range(n)]
+        self.count = [0] * n
+        self.total = [0] * n
+        self.max = [0] * n
+
+    # Stamp the falling edges of the buttons by IRQ
+    def attach(self):
+        for i in range(len(LATENCY_PINS)):
+            pin = machine.Pin(LATENCY_PINS[i], machine.Pin.IN, machine.Pin.PULL_UP)
+            pin.irq(trigger=machine.Pin.IRQ_FALLING, handler=self.edge_handler(i))
+
+    # IRQ handler stamping a button, allocates nothing
+    def edge_handler(self, button):
+        def handler(pin):
+            self.edges[button] = ticks_ms()
+        return handler
+
+    # Take the tick of a press (button: index of LATENCY_BUTTONS)
+    #   The tick of the falling edge, or now for a repeat of a held button.
+    def edge(self, button):
+        now = ticks_ms()
+        tick = self.edges[button]
+        self.edges[button] = -1
+        if tick < 0 or ticks_diff(now, tick) > INPUT_PERIOD * 2000:
+            return now
+        return tick
+
+    # Record an input (button: index of LATENCY_BUTTONS, tick: tick of edge())
+    def press(self, button, tick):
+        if self.pressed[button] < 0:
+            self.pressed[button] = tick
+
+    # The stamped inputs will be drawn in current frame
+    def drawn(self):
+        for i in range(len(self.pressed)):
+            if self.pressed[i] >= 0:
+                if self.drawing[i] < 0:
+                    self.drawing[i] = self.pressed[i]
+                self.pressed[i] = -1
+
+    # The drawn inputs have been shown on the display
+    def shown(self):
+        now = ticks_ms()
+        for i in range(len(self.drawing)):
+            if self.drawing[i] >= 0:
+                ms = ticks_diff(now, self.drawing[i])
+                self.drawing[i] = -1
+
+                b = 0
+                while b < len(LATENCY_BUCKETS) and ms > LATENCY_BUCKETS[b]:
+                    b += 1
+                self.histogram[i][b] += 1
+                self.count[i] += 1
+                self.total[i] += ms
+                if ms > self.max[i]:
+                    self.max[i] = ms
+
+    # Histograms as a string
+    def report(self):
+        rep = "LATENCY(ms) <=" + str(LATENCY_BUCKETS) + ",over"
+        for i in range(len(LATENCY_BUTTONS)):
+            avg = int(self.total[i] / self.count[i]) if self.count[i] > 0 else 0
+            rep += "\n  " + LATENCY_BUTTONS[i] + ": N=" + str(self.count[i]) + " AVG=" + str(avg) + " MAX=" + str(self.max[i]) + " " + str(self.histogram[i])
+        return rep
+
+input_latency = Input_latency_class()
+
+########### END OF Input_latency_class ###########
+
+'''
+# Overlay cache class (static texts of the title, GAME OVER and GAME CLEAR screens)
+#    PicoGraphics has no off-screen buffer to blit, so the texts rendered in the frame buffer are the cache.
+#    A text is rendered again only when its inputs change or moving objects have damaged its region.
+#    begin() starts new texts if the key of their inputs has changed.
+#    add() adds a text.
+#    damage() and damage_objects() mark the texts overlapping a region to be redrawn.
+#    covers() tells whether a point is under a text (stars are not drawn there).
+#    blit() redraws the marked texts.
+'''
+class Overlay_cache_class:
+    def __init__(self):
+        self.key = None
+        self.items = []                    # [pen, text, x1, y1, scale, x2, y2, damaged, damaged previous frame]
+
+    # Forget the texts (the screen has been cleared)
+    def invalidate(self):
+        self.key = None
+
+    # Start new texts
+    #   key: Inputs of the texts
+    #   Return True if the texts should be added again.
+    def begin(self, key):
+        if key == self.key:
+            return False
+
+        self.key = key
+        self.items = []
+        return True
+
+    # Add a text (str, x, y, scale)
+    def add(self, pen, text, x, y, scale):
+        x2 = min(x + len(text) * 6 * scale, WIDTH)       # bitmap8 glyph is 6 pixels wide with the spacing
+        y2 = min(y + 8 * scale, HEIGHT)
+        self.items.append([pen, text, x, y, scale, x2, y2, True, False])
+
+    # Mark the texts overlapping a rectangle (x1, y1)-(x2, y2)
+    def damage(self, x1, y1, x2, y2):
+        for item in self.items:
+            if x1 < item[5] and x2 > item[2] and y1 < item[6] and y2 > item[3]:
+                item[7] = True
+
+    # Mark the texts overlapping moving objects
+    def damage_objects(self, objects):
+        for obj in objects:
+            if obj.display:
+                self.damage(obj.x - obj.r, obj.y - obj.r, obj.x + obj.r + MISSILE_LENGTH + 1, obj.y + obj.r + 1)
+
+    # A point is under a text or not
+    def covers(self, x, y):
+        for item in self.items:
+            if x >= item[2] and x < item[5] and y >= item[3] and y < item[6]:
+                return True
+        return False
+
+    # Redraw the texts damaged in this or the previous frame
+    #   An object erases itself at the position drawn in the previous frame, so damage lasts for two frames.
+    #   The band renderer draws every frame from scratch, so all the texts are redrawn.
+    def blit(self):
+        for item in self.items:
+            if item[7] or item[8] or FULL_REDRAW:
+                display.set_pen(item[0])
+                # str, x, y, word-wrapp pixels, scale (, angle, spacing, fixed-space)
+                display.text(item[1], item[2], item[3], WIDTH, item[4])
+            item[8] = item[7]
+            item[7] = False
+
+########### END OF Overlay_cache_class ###########
+
 '''
 # Game stage class
 '''
@@ -171,38 +800,48 @@ class Game_stage_class:
     def __init__(self, battle_ship):
         self.battle_ship = battle_ship
         self.str_prev = ""
+        self.overlay = Overlay_cache_class()
         self.stars = []
         for i in list(range(20)):
-            self.stars.append([random.randint(1, WIDTH), random.randint(TITLE_HEIGHT, HEIGHT), random.randint(1, 3)])
+            self.stars.append([random.randint(1, WIDTH), random.randint(TITLE_HEIGHT, HEIGHT), random.randint(1, 3), False])   # x, y, speed, drawn
 
     # Clear the screen
     def clear(self, with_update = False):
         display.set_pen(BLACK)
         display.clear()
+        self.overlay.invalidate()
+        for star in self.stars:
+            star[3] = False
         if with_update:
             display.update()
 
     # Draw the game stage (Background tiny stars, STAGE, LEFT and SCORE)
-    def draw(self):
+    #   overlay: Overlay_cache_class instance, stars are not drawn under its texts
+    #   with_text: Draw STAGE, LEFT and SCORE or not
+    def draw(self, overlay = None, with_text = True):
         # Erase the previous text
-        if self.str_prev != "":
+        if with_text and self.str_prev != "":
             display.set_pen(BLACK)
             # str, x, y, word-wrapp pixels, scale (, angle, spacing, fixed-space)
-            display.text(self.str_prev, 0, 0, 240, 2)
-            
+            display.text(self.str_prev, 0, 0, WIDTH, LAYOUT["header_scale"])
+
         # Move stars and redraw them
         for star in self.stars:
-            display.set_pen(BLACK)
-            display.pixel(star[0], star[1])
+            if star[3]:
+                display.set_pen(BLACK)
+                display.pixel(star[0], star[1])
             star[0] = (star[0] - star[2]) % WIDTH        
-            display.set_pen(WHITE)
-            display.pixel(star[0], star[1])
+            star[3] = overlay is None or not overlay.covers(star[0], star[1])
+            if star[3]:
+                display.set_pen(WHITE)
+                display.pixel(star[0], star[1])
 
         # Draw new text
-        display.set_pen(WHITE)
-        # str, x, y, word-wrapp pixels, scale (, angle, spacing, fixed-space)
-        self.str_prev = "STAGE " + (str(self.battle_ship.stage) if self.battle_ship.stage <= FINAL_STAGE else "CL") + "  LEFT=" + str(self.battle_ship.ships) + "  SC=" + str(self.battle_ship.score)
-        display.text(self.str_prev, 0, 0, 240, 2)
+        if with_text:
+            display.set_pen(WHITE)
+            # str, x, y, word-wrapp pixels, scale (, angle, spacing, fixed-space)
+            self.str_prev = "STAGE " + (str(self.battle_ship.stage) if self.battle_ship.stage <= FINAL_STAGE else "CL") + "  LEFT=" + str(self.battle_ship.ships) + "  SC=" + str(self.battle_ship.score)
+            display.text(self.str_prev, 0, 0, WIDTH, LAYOUT["header_scale"])
 
 ########### END OF Game_stage_class ###########
 
@@ -522,7 +1161,9 @@ class Battle_ship_class(Object_class):
         return False
 
     # Fire a missile
+    #   Return True if a missile has been fired.
     def fire(self):
+        fired = False
         if self.display:
             for missile in self.missiles:
                 if not missile.display:
@@ -531,6 +1172,8 @@ class Battle_ship_class(Object_class):
                     else:
                         missile.fire(self.x + self.r, self.y, MISSILE_POWERED)
                         self.missile_upgrade -= 1
+                    fired = True
+        return fired
 
     # Check collisions
     #   Return True if game is over.
@@ -635,6 +1278,9 @@ class Battle_ship_class(Object_class):
 
         # Redraw the battle ship
         if self.display:
+            # The inputs until now will be shown in this frame
+            input_latency.drawn()
+
             # Move and draw missiles
             for missile in self.missiles:
                 missile.draw()
@@ -657,10 +1303,190 @@ class Battle_ship_class(Object_class):
 
 ########### END OF Multi_core_class ###########
 
+'''
+# Game snapshot class (suspend and resume a game in progress)
+#    Fixed layout binary packed with struct, little endian:
+#      HEADER : magic, version, crc32 of the rest of the buffer, stage, ships, missile_upgrade, score, score_max,
+#               ship x, ship y, ship speed, ship flags, enemy model, generated, random seed
+#      ENEMY  : flags, model, speed, warp_timer, move_dir_change, move_dir x, move_dir y, x, y  (x EMEMIES_MAX)
+#      MISSILE: flags, missile_grade, r, speed, x, y  (x MISSILE_MAX)
+#    The random module can not export its state, so pack() re-seeds it with a new seed and records the seed.
+#    Saving never blocks core0:
+#      Set save_request on either core, core1 packs the game in frame_end() at the end of its frame,
+#      then core0 writes the packed buffer with write().
+#    load() restores the game without drawing any frames.  A file with a wrong CRC or out of range values
+#    (a torn write) is removed instead of being loaded, so it can not crash the worker at every boot.
+#    remove() removes the file when the game has ended, so it will never resume a finished game.
+'''
+class Game_snapshot_class:
+    HEADER = "<4sBIBbHIIhhBBBHI"
+    CRC_OFFSET = 5                     # Offset of the crc32 in HEADER, the CRC covers the bytes after it
+    ENEMY = "<BBBBBbbhh"
+    MISSILE = "<BBBBhh"
+
+    def __init__(self, file_name = SNAPSHOT_FILE):
+        self.file_name = file_name
+        self.header_size = struct.calcsize(Game_snapshot_class.HEADER)
+        self.enemy_size = struct.calcsize(Game_snapshot_class.ENEMY)
+        self.missile_size = struct.calcsize(Game_snapshot_class.MISSILE)
+        self.buf = bytearray(self.header_size + self.enemy_size * EMEMIES_MAX + self.missile_size * MISSILE_MAX)
+        self.save_request = False          # Pack the game at the end of the next frame
+        self.packed = False                # The buffer is waiting to be written
+        self.stored = False                # The file has a game in progress
+
+    # Object flags: bit0=display, bit1=disappear
+    def flags(self, obj):
+        return (1 if obj.display else 0) | (2 if obj.disappear else 0)
+
+    def set_flags(self, obj, fl):
+        obj.display = (fl & 1) != 0
+        obj.disappear = (fl & 2) != 0
+
+    # Pack the game state into the buffer
+    def pack(self, battle_ship, enemy_ships):
+        seed = random.getrandbits(30)
+        random.seed(seed)
+
+        # Battle ship flags: the object flags, bit2=ship_destroyed, bit3=go_to_next_stage
+        fl = self.flags(battle_ship) | (4 if battle_ship.ship_destroyed else 0) | (8 if battle_ship.go_to_next_stage else 0)
+        struct.pack_into(Game_snapshot_class.HEADER, self.buf, 0, SNAPSHOT_MAGIC, SNAPSHOT_VERSION, 0,
+                         battle_ship.stage, battle_ship.ships, battle_ship.missile_upgrade, battle_ship.score, battle_ship.score_max,
+                         battle_ship.x, battle_ship.y, battle_ship.speed, fl, enemy_ships.model, enemy_ships.generated, seed)
+
+        pos = self.header_size
+        for enemy in enemy_ships.enemies:
+            struct.pack_into(Game_snapshot_class.ENEMY, self.buf, pos, self.flags(enemy), enemy.model, enemy.speed,
+                             enemy.warp_timer, enemy.move_dir_change, enemy.move_dir[0], enemy.move_dir[1], enemy.x, enemy.y)
+            pos += self.enemy_size
+
+        for missile in battle_ship.missiles:
+            struct.pack_into(Game_snapshot_class.MISSILE, self.buf, pos, self.flags(missile), missile.missile_grade,
+                             missile.r, missile.speed, missile.x, missile.y)
+            pos += self.missile_size
+
+        struct.pack_into("<I", self.buf, Game_snapshot_class.CRC_OFFSET, self.crc())
+
+    # CRC of the buffer after the crc32 field
+    def crc(self):
+        return binascii.crc32(memoryview(self.buf)[Game_snapshot_class.CRC_OFFSET + 4:]) & 0xffffffff
+
+    # Validate the buffer before restoring it
+    #   Return True if the buffer is a snapshot of this version without broken or out of range values.
+    def valid(self):
+        magic, version, crc, stage, ships, upgrade, score, score_max, x, y, speed, fl, model, generated, seed = struct.unpack_from(Game_snapshot_class.HEADER, self.buf, 0)
+        if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION or crc != self.crc():
+            return False
+
+        if stage < 1 or stage > FINAL_STAGE or ships < 1 or ships > SHIPS_INIT or model >= len(STAGE_ENEMIES):
+            return False
+
+        pos = self.header_size
+        for i in range(EMEMIES_MAX):
+            if struct.unpack_from(Game_snapshot_class.ENEMY, self.buf, pos)[1] >= len(An_Enemy_ship_class.model_attr):
+                return False
+            pos += self.enemy_size
+
+        for i in range(MISSILE_MAX):
+            if struct.unpack_from(Game_snapshot_class.MISSILE, self.buf, pos)[1] > MISSILE_EXPLODE:
+                return False
+            pos += self.missile_size
+
+        return True
+
+    # Restore the game state from the buffer
+    #   Return False if the buffer is not a valid snapshot of this version.
+    def unpack(self, battle_ship, enemy_ships):
+        if not self.valid():
+            return False
+
+        magic, version, crc, stage, ships, upgrade, score, score_max, x, y, speed, fl, model, generated, seed = struct.unpack_from(Game_snapshot_class.HEADER, self.buf, 0)
+
+        battle_ship.stage = stage
+        battle_ship.ships = ships
+        battle_ship.missile_upgrade = upgrade
+        battle_ship.score = score
+        battle_ship.score_max = score_max
+        battle_ship.x = x
+        battle_ship.y = y
+        battle_ship.speed = speed
+        self.set_flags(battle_ship, fl)
+        battle_ship.ship_destroyed = (fl & 4) != 0
+        battle_ship.go_to_next_stage = (fl & 8) != 0
+        battle_ship.r_prev = 0                    # Nothing to erase on the cleared screen
+        enemy_ships.model = model
+        enemy_ships.generated = generated
+
+        pos = self.header_size
+        for enemy in enemy_ships.enemies:
+            fl, enemy.model, enemy.speed, enemy.warp_timer, enemy.move_dir_change, dx, dy, enemy.x, enemy.y = struct.unpack_from(Game_snapshot_class.ENEMY, self.buf, pos)
+            self.set_flags(enemy, fl)
+            enemy.move_dir = (dx, dy)
+            pos += self.enemy_size
+
+        for missile in battle_ship.missiles:
+            fl, missile.missile_grade, missile.r, missile.speed, missile.x, missile.y = struct.unpack_from(Game_snapshot_class.MISSILE, self.buf, pos)
+            self.set_flags(missile, fl)
+            pos += self.missile_size
+
+        random.seed(seed)
+        return True
+
+    # Pack the game if requested, core1 calls this at the end of a frame
+    def frame_end(self, battle_ship, enemy_ships):
+        if self.save_request and not self.packed:
+            self.save_request = False
+            if battle_ship.ships > 0 and battle_ship.stage <= FINAL_STAGE:
+                self.pack(battle_ship, enemy_ships)
+                self.packed = True
+
+    # Write the packed game to the flash, core0 calls this
+    def write(self):
+        if not self.packed:
+            return False
+
+        try:
+            with open(self.file_name, "wb") as f:
+                f.write(self.buf)
+            self.stored = True
+            print("GAME SAVED.")
+            return True
+        except OSError as e:
+            print("COULD NOT SAVE THE GAME:", e)
+            return False
+        finally:
+            self.packed = False
+
+    # Load the saved game
+    #   Return True if the game has been restored, a broken file is removed.
+    def load(self, battle_ship, enemy_ships):
+        try:
+            with open(self.file_name, "rb") as f:
+                size = f.readinto(self.buf)
+        except OSError:
+            return False
+
+        if size != len(self.buf) or not self.unpack(battle_ship, enemy_ships):
+            print("BROKEN SAVED GAME REMOVED.")
+            self.remove()
+            return False
+
+        self.stored = True
+        return True
+
+    # Remove the saved game
+    def remove(self):
+        self.stored = False
+        try:
+            os.remove(self.file_name)
+        except OSError:
+            pass
+
+########### END OF Game_snapshot_class ###########
+
 '''
 # Draw all game objects, works in the multi-core process
 '''
-def draw_display(core1, game_stage, battle_ship, enemy_ships):
+def draw_display(core1, game_stage, battle_ship, enemy_ships, snapshot = None):
 #    st = core1.get_status()
 #    print(st["worker_name"] + " DRAW")
 
@@ -668,33 +1494,33 @@ def draw_display(core1, game_stage, battle_ship, enemy_ships):
     if battle_ship.ships > 0:
         # Stage clear
         if battle_ship.go_to_next_stage:
+            core1.set_phase("STAGE_CLEAR")
             # Clear all stages, game end
             if battle_ship.stage >= FINAL_STAGE:
                 battle_ship.stage = FINAL_STAGE + 1
-                game_stage.draw()
-                enemy_ships.draw()
-                display.set_pen(GREEN)
-                display.text("GAME CLEAR", 0, 20, 240, 5)
-                if battle_ship.score > battle_ship.score_max:
-                    display.set_pen(MAGENTA)
-                    display.text("HIGH SCORE!!", 22, 67, 240, 4)
-                else:
-                    display.set_pen(CYAN)
-                    display.text("HIGH-SC=" + str(battle_ship.score_max), 15, 73, 240, 3)
-                display.set_pen(GREEN)
-                display.text("X: REPLAY", 65, 111, 240, 3)
+                overlay = game_stage.overlay
+                if overlay.begin(("GAME CLEAR", battle_ship.score > battle_ship.score_max, battle_ship.score_max)):
+                    overlay.add(GREEN, "GAME CLEAR", *LAYOUT["game_clear"])
+                    if battle_ship.score > battle_ship.score_max:
+                        overlay.add(MAGENTA, "HIGH SCORE!!", *LAYOUT["high_score"])
+                    else:
+                        overlay.add(CYAN, "HIGH-SC=" + str(battle_ship.score_max), *LAYOUT["high_sc"])
+                    overlay.add(GREEN, "X: REPLAY", *LAYOUT["replay"])
 
             # Next stage
             else:
                 display.set_pen(YELLOW)
+                x, y, scale = LAYOUT["banner"]
+                if BAND_HEIGHT > 0:
+                    display.keep_scene()                  # The band renderer shows the banner over the last frame
                 for i in [3,2,1]:
                     display.set_pen(CYAN)
                     msg = "STAGE CLR" + "." * i
-                    display.text(msg, 12, 50, 240, 4)
+                    display.text(msg, x, y, WIDTH, scale)
                     display.update()
-                    time.sleep(1)
+                    core1.wait(1)
                     display.set_pen(BLACK)
-                    display.text(msg, 12, 50, 240, 4)
+                    display.text(msg, x, y, WIDTH, scale)
 
                 battle_ship.stage += 1
                 battle_ship.go_to_next_stage = False
@@ -702,62 +1528,578 @@ def draw_display(core1, game_stage, battle_ship, enemy_ships):
                 battle_ship.restart(battle_ship.stage)
                 game_stage.clear()
 
+                # Save the game at the start of the stage
+                if snapshot is not None:
+                    snapshot.save_request = True
+
         # The battle ship has been destroyed, then clear this stage
         elif battle_ship.ship_destroyed:
+            core1.set_phase("DESTROYED")
             display.set_pen(YELLOW)
+            x, y, scale = LAYOUT["banner"]
+            if BAND_HEIGHT > 0:
+                display.keep_scene()                      # The band renderer shows the banner over the last frame
             for i in [3,2,1]:
                 display.set_pen(YELLOW)
                 msg = "DESTROYED" + "." * i
-                display.text(msg, 12, 50, 240, 4)
+                display.text(msg, x, y, WIDTH, scale)
                 display.update()
-                time.sleep(1)
+                core1.wait(1)
                 display.set_pen(BLACK)
-                display.text(msg, 12, 50, 240, 4)
+                display.text(msg, x, y, WIDTH, scale)
 
             battle_ship.ship_destroyed = False
             game_stage.clear()
 
         # Check collisions of objects in the game screen
+        core1.set_phase("COLLISION")
         battle_ship.check_collisions()
 
         # Move objects and redraw the game screen
-        game_stage.draw()
-        enemy_ships.draw()
-        battle_ship.draw()
+        core1.set_phase("PLAY")
+        if battle_ship.stage > FINAL_STAGE:
+            # GAME CLEAR texts over the game screen
+            overlay = game_stage.overlay
+            game_stage.draw(overlay)
+            enemy_ships.draw()
+            battle_ship.draw()
+            overlay.damage_objects(enemy_ships.enemies)
+            overlay.damage_objects(battle_ship.missiles)
+            if battle_ship.r_prev > 0:
+                overlay.damage(battle_ship.x_prev - battle_ship.r_prev, battle_ship.y_prev - battle_ship.r_prev, battle_ship.x_prev + battle_ship.r_prev + 1, battle_ship.y_prev + battle_ship.r_prev + 1)
+            overlay.blit()
+        else:
+            game_stage.draw()
+            enemy_ships.draw()
+            battle_ship.draw()
 
     # Game over
     elif battle_ship.ships == 0:
-        game_stage.draw()
+        core1.set_phase("GAME_OVER")
+        overlay = game_stage.overlay
+        if overlay.begin(("GAME OVER", battle_ship.score > battle_ship.score_max, battle_ship.score_max)):
+            overlay.add(YELLOW, "GAME OVER", *LAYOUT["game_over"])
+            if battle_ship.score > battle_ship.score_max:
+                overlay.add(MAGENTA, "HIGH SCORE!!", *LAYOUT["high_score"])
+            else:
+                overlay.add(CYAN, "HIGH-SC=" + str(battle_ship.score_max), *LAYOUT["high_sc"])
+            overlay.add(GREEN, "X: REPLAY", *LAYOUT["replay"])
+
+        game_stage.draw(overlay)
         enemy_ships.draw()
-        display.set_pen(YELLOW)
-        display.text("GAME OVER", 15, 20, 240, 5)
-        if battle_ship.score > battle_ship.score_max:
-            display.set_pen(MAGENTA)
-            display.text("HIGH SCORE!!", 22, 67, 240, 4)
-        else:
-            display.set_pen(CYAN)
-            display.text("HIGH-SC=" + str(battle_ship.score_max), 15, 73, 240, 3)
-        display.set_pen(GREEN)
-        display.text("X: REPLAY", 65, 111, 240, 3)
+        overlay.damage_objects(enemy_ships.enemies)
+        overlay.blit()
 
     # Start up
     else:
-        game_stage.draw()
-        display.set_pen(BLACK)
-        display.rectangle(0, 0, WIDTH, TITLE_HEIGHT)
-        display.set_pen(YELLOW)
-        display.text("--ASTEROIDS--", 3, 0, 240, 4)
-        display.set_pen(RED)
-        display.text("A: MOVE UP", 15, 30, 240, 3)
-        display.text("B: MOVE DOWN", 15, 57, 240, 3)
-        display.text("Y: FIRE A MISSILE", 15, 84, 240, 3)
-        display.set_pen(GREEN)
-        display.text("X: PLAY", 15, 111, 240, 3)
-
+        core1.set_phase("TITLE")
+        overlay = game_stage.overlay
+        if overlay.begin("TITLE"):
+            overlay.add(YELLOW, "--ASTEROIDS--", *LAYOUT["logo"])
+            overlay.add(RED, "A: MOVE UP", *LAYOUT["help_up"])
+            overlay.add(RED, "B: MOVE DOWN", *LAYOUT["help_down"])
+            overlay.add(RED, "Y: FIRE A MISSILE", *LAYOUT["help_fire"])
+            overlay.add(GREEN, "X: PLAY", *LAYOUT["play"])
+
+        game_stage.draw(overlay, False)
+        overlay.blit()
+
+    core1.set_phase("UPDATE")
     display.update()
+    input_latency.shown()
+    core1.beat()
+    if snapshot is not None:
+        snapshot.frame_end(battle_ship, enemy_ships)
     time.sleep(0.01)
 
 
+'''
+# Incident ring buffer class, the incidents are kept on the flash to read them at the next boot
+#    Fixed layout binary packed with struct, little endian:
+#      HEADER  : magic, version, next index
+#      INCIDENT: type, phase index of WORKER_PHASES, duration (msec), heartbeat, count  (x INCIDENT_MAX)
+#    add() records an incident in RAM, the same error in the same phase as the last incident only counts up.
+#    set_duration() updates the duration of a recorded incident.
+#    save() writes the ring buffer to the flash.
+'''
+class Incident_log_class:
+    HEADER = "<4sBB"
+    INCIDENT = "<BBHIH"
+    MAGIC = b"AINC"
+    VERSION = 2
+    TYPES = ["", "STALL", "ERROR", "WDT_RESET"]
+
+    def __init__(self, file_name = INCIDENT_FILE):
+        self.file_name = file_name
+        self.header_size = struct.calcsize(Incident_log_class.HEADER)
+        self.incident_size = struct.calcsize(Incident_log_class.INCIDENT)
+        self.buf = bytearray(self.header_size + self.incident_size * INCIDENT_MAX)
+        self.next = 0
+        self.modified = False
+        struct.pack_into(Incident_log_class.HEADER, self.buf, 0, Incident_log_class.MAGIC, Incident_log_class.VERSION, self.next)
+
+    # Record an incident
+    #   kind: INCIDENT_STALL, INCIDENT_ERROR or INCIDENT_WDT_RESET
+    #   phase: Phase of the worker
+    #   ms: Duration of the incident (msec)
+    #   heartbeat: Heartbeat when the incident occurred
+    #   RETURN: Index of the incident in the ring buffer
+    def add(self, kind, phase, ms, heartbeat):
+        ph = WORKER_PHASES.index(phase) if phase in WORKER_PHASES else 0
+        self.modified = True
+
+        # Count up the same error
+        last = (self.next - 1) % INCIDENT_MAX
+        pos = self.header_size + self.incident_size * last
+        last_kind, last_ph, last_ms, last_heartbeat, count = struct.unpack_from(Incident_log_class.INCIDENT, self.buf, pos)
+        if kind == INCIDENT_ERROR and last_kind == kind and last_ph == ph:
+            struct.pack_into(Incident_log_class.INCIDENT, self.buf, pos, kind, ph, min(ms, 65535), heartbeat & 0xffffffff, min(count + 1, 65535))
+            return last
+
+        index = self.next
+        struct.pack_into(Incident_log_class.INCIDENT, self.buf, self.header_size + self.incident_size * index, kind, ph, min(ms, 65535), heartbeat & 0xffffffff, 1)
+        self.next = (self.next + 1) % INCIDENT_MAX
+        struct.pack_into(Incident_log_class.HEADER, self.buf, 0, Incident_log_class.MAGIC, Incident_log_class.VERSION, self.next)
+        print("INCIDENT:", Incident_log_class.TYPES[kind], phase, ms, "ms")
+        return index
+
+    # Update the duration of an incident
+    #   index: Index returned by add()
+    #   ms: Duration of the incident (msec)
+    def set_duration(self, index, ms):
+        struct.pack_into("<H", self.buf, self.header_size + self.incident_size * index + 2, min(ms, 65535))
+        self.modified = True
+
+    # Incidents from the oldest one
+    #   RETURN: list of (type name, phase, msec, heartbeat, count)
+    def incidents(self):
+        res = []
+        for i in range(INCIDENT_MAX):
+            pos = self.header_size + self.incident_size * ((self.next + i) % INCIDENT_MAX)
+            kind, ph, ms, heartbeat, count = struct.unpack_from(Incident_log_class.INCIDENT, self.buf, pos)
+            if kind > 0:
+                res.append((Incident_log_class.TYPES[kind], WORKER_PHASES[ph], ms, heartbeat, count))
+        return res
+
+    # Write the ring buffer to the flash
+    def save(self):
+        try:
+            with open(self.file_name, "wb") as f:
+                f.write(self.buf)
+            self.modified = False
+            return True
+        except OSError as e:
+            print("COULD NOT SAVE THE INCIDENTS:", e)
+            return False
+
+    # Read the ring buffer from the flash
+    #   Return False if there is no ring buffer of this version.
+    def load(self):
+        buf = bytearray(len(self.buf))
+        try:
+            with open(self.file_name, "rb") as f:
+                if f.readinto(buf) != len(buf):
+                    return False
+        except OSError:
+            return False
+
+        magic, version, nxt = struct.unpack_from(Incident_log_class.HEADER, buf, 0)
+        if magic != Incident_log_class.MAGIC or version != Incident_log_class.VERSION or nxt >= INCIDENT_MAX:
+            return False
+
+        self.buf = buf
+        self.next = nxt
+        return True
+
+########### END OF Incident_log_class ###########
+
+'''
+# Main-core task class, uasyncio tasks work on core0 while core1 draws the game
+#    input_task() polls the buttons.
+#    persistence_task() does the flash writes requested by the other tasks.
+#    housekeeping_task() runs the garbage collector.
+#    stats_task() prints the game statistics.
+#    watchdog_task() monitors the heartbeat of core1, restarts the worker after an exception,
+#      and feeds the hardware watchdog (opt-in, WDT_TIMEOUT > 0) only while the frames are progressing.
+#    run() starts all tasks, this never returns.
+#    uasyncio has no task priority, so a task with a longer period has a lower priority.
+#    The tasks except input_task() must return to the scheduler quickly not to delay the buttons.
+'''
+class Main_core_class:
+    def __init__(self, core1, game_stage, battle_ship, enemy_ships, snapshot, incident_log):
+        self.core1 = core1
+        self.game_stage = game_stage
+        self.battle_ship = battle_ship
+        self.enemy_ships = enemy_ships
+        self.snapshot = snapshot
+        self.incident_log = incident_log
+        self.remove_request = False        # Deferred flash writes (saving is requested to snapshot)
+        self.suspend_held = False          # X and Y are held (save once)
+
+    # Poll the buttons once
+    #   Button.read() is True only on the press and at the repeat time, so every button is read once in a poll.
+    #   The X+Y suspend is checked with the levels (raw()), then X alone restarts the game.
+    def poll_input(self):
+        battle_ship = self.battle_ship
+        pressed_a = button_a.read()
+        pressed_b = button_b.read()
+        pressed_x = button_x.read()
+        pressed_y = button_y.read()
+
+        # Suspend the game in progress (hold X and Y)
+        if button_x.raw() and button_y.raw():
+            if not self.suspend_held and battle_ship.ships > 0 and battle_ship.stage <= FINAL_STAGE:
+                self.snapshot.save_request = True
+            self.suspend_held = True
+            return
+
+        self.suspend_held = False
+
+        # Move up the battle ship
+        if pressed_a:                                         # if a button press is detected then...
+            tick = input_latency.edge(0)
+            battle_ship.move_rel(0, -1)
+            if battle_ship.display:
+                input_latency.press(0, tick)
+
+        # Move down the battle ship
+        if pressed_b:
+            tick = input_latency.edge(1)
+            battle_ship.move_rel(0,  1)
+            if battle_ship.display:
+                input_latency.press(1, tick)
+
+        # Restart the game
+        if pressed_x:
+            if battle_ship.ships <= 0 or battle_ship.stage > FINAL_STAGE:
+                self.game_stage.clear(True)
+                battle_ship.restart()
+                self.remove_request = True
+
+        # Fire a missile
+        if pressed_y:
+            tick = input_latency.edge(2)
+            if battle_ship.fire():
+                input_latency.press(2, tick)
+
+    # Poll the buttons
+    async def input_task(self):
+        while True:
+            self.poll_input()
+            await asyncio.sleep(INPUT_PERIOD)
+
+    # Write to the flash
+    async def persistence_task(self):
+        incident_tick = ticks_ms()
+        while True:
+            if self.snapshot.packed:
+                self.snapshot.write()
+
+            if self.remove_request:
+                self.remove_request = False
+                self.snapshot.remove()
+
+            # The game has ended, never resume it at the next boot
+            if self.snapshot.stored and (self.battle_ship.ships == 0 or self.battle_ship.stage > FINAL_STAGE):
+                self.snapshot.remove()
+
+            # Write the incidents at most once in INCIDENT_SAVE_INTERVAL
+            if self.incident_log.modified and ticks_diff(ticks_ms(), incident_tick) >= INCIDENT_SAVE_INTERVAL:
+                self.incident_log.save()
+                incident_tick = ticks_ms()
+
+            await asyncio.sleep(PERSIST_PERIOD)
+
+    # Collect garbage regularly instead of the long collection in the middle of a frame
+    async def housekeeping_task(self):
+        while True:
+            gc.collect()
+            await asyncio.sleep(HOUSEKEEPING_PERIOD)
+
+    # Print the game statistics
+    async def stats_task(self):
+        while True:
+            await asyncio.sleep(STATS_PERIOD)
+            print("STAGE=", self.battle_ship.stage, "LEFT=", self.battle_ship.ships, "SC=", self.battle_ship.score, "MEM=", mem_free(), self.core1.get_status())
+            print(input_latency.report())
+
+    # Monitor the heartbeat of core1
+    async def watchdog_task(self):
+        core1 = self.core1
+        wdt = machine.WDT(timeout=WDT_TIMEOUT) if WDT_TIMEOUT > 0 else None
+        heartbeat = core1.heartbeat
+        beat_tick = ticks_ms()
+        stalled = False
+        stall_index = 0
+        restarts = 0                       # Restarts without any frame
+        restart_tick = None
+        restart_wait = 0
+        while True:
+            await asyncio.sleep(WATCHDOG_PERIOD)
+            now = ticks_ms()
+
+            # The worker stopped by an exception, restart it after a wait getting longer
+            if core1.worker_error is not None:
+                self.incident_log.add(INCIDENT_ERROR, core1.phase, ticks_diff(now, beat_tick), core1.heartbeat)
+                core1.worker_error = None
+                if restarts < WORKER_RESTART_MAX:
+                    restart_wait = WORKER_RESTART_WAIT << restarts
+                    restart_tick = now
+                    restarts += 1
+                else:
+                    print("WORKER IS NOT RESTARTED.")
+
+            if restart_tick is not None and ticks_diff(now, restart_tick) >= restart_wait:
+                restart_tick = None
+                core1.worker_start()
+
+            # Frames are progressing
+            if core1.heartbeat != heartbeat:
+                if stalled:
+                    self.incident_log.set_duration(stall_index, ticks_diff(now, beat_tick))
+                    print("STALL END:", ticks_diff(now, beat_tick), "ms")
+                heartbeat = core1.heartbeat
+                beat_tick = now
+                stalled = False
+                restarts = 0
+
+            # Heartbeat stalled, keep the duration updated until the stall ends
+            elif stalled:
+                self.incident_log.set_duration(stall_index, ticks_diff(now, beat_tick))
+
+            elif ticks_diff(now, beat_tick) > STALL_MS:
+                stalled = True
+                stall_index = self.incident_log.add(INCIDENT_STALL, core1.phase, ticks_diff(now, beat_tick), heartbeat)
+
+            if wdt is not None and not stalled:
+                wdt.feed()
+
+    # Start all tasks
+    async def run(self):
+        tasks = [asyncio.create_task(self.input_task()),
+                 asyncio.create_task(self.persistence_task()),
+                 asyncio.create_task(self.housekeeping_task()),
+                 asyncio.create_task(self.stats_task())]
+        if self.core1.get_status()["core1_on"]:
+            tasks.append(asyncio.create_task(self.watchdog_task()))
+        await asyncio.gather(*tasks)
+
+########### END OF Main_core_class ###########
+
+'''
+# Draw cost counting class, a proxy of the display object
+#    Counts the primitive calls by type, pen switches, pixels touched and text glyphs in a frame.
+#    Pixels are estimated from the shape sizes (text: 6x8 pixels per glyph), so the counts do not
+#    depend on the display driver and are the same on any machine.
+#    update() closes a frame and keeps the peak counts and the total counts of the frames for each scene.
+#    mean() is the average counts per frame of a scene, the peak frames alone do not show the cost of redrawing
+#    the same things in every frame.
+'''
+class Draw_cost_class:
+    COUNTERS = ("pixel", "pixel_span", "rectangle", "circle", "triangle", "text", "clear", "set_pen", "pixels", "glyphs")
+
+    def __init__(self, target):
+        self.target = target
+        self.pen = None
+        self.scene = ""
+        self.peak = {}                     # {scene: {counter: peak count in a frame}}
+        self.total = {}                    # {scene: {counter: total count of the frames}}
+        self.scene_frames = {}             # {scene: number of frames}
+        self.frames = 0
+        self.counts = {}
+        self.reset()
+
+    # Reset the counts of current frame
+    def reset(self):
+        for name in Draw_cost_class.COUNTERS:
+            self.counts[name] = 0
+
+    def count(self, name, pixels):
+        self.counts[name] += 1
+        self.counts["pixels"] += pixels
+
+    def set_pen(self, pen):
+        if pen != self.pen:
+            self.pen = pen
+            self.counts["set_pen"] += 1
+        self.target.set_pen(pen)
+
+    def clear(self):
+        self.count("clear", WIDTH * HEIGHT)
+        self.target.clear()
+
+    def pixel(self, x, y):
+        self.count("pixel", 1)
+        self.target.pixel(x, y)
+
+    def pixel_span(self, x, y, l):
+        self.count("pixel_span", l)
+        self.target.pixel_span(x, y, l)
+
+    def rectangle(self, x, y, w, h):
+        self.count("rectangle", w * h)
+        self.target.rectangle(x, y, w, h)
+
+    def circle(self, x, y, r):
+        self.count("circle", r * r * 22 // 7)
+        self.target.circle(x, y, r)
+
+    def triangle(self, x1, y1, x2, y2, x3, y3):
+        self.count("triangle", abs((x2 - x1) * (y3 - y1) - (x3 - x1) * (y2 - y1)) // 2)
+        self.target.triangle(x1, y1, x2, y2, x3, y3)
+
+    def text(self, text, x, y, wordwrap = WIDTH, scale = 1, *args):
+        self.count("text", len(text) * 48 * scale * scale)
+        self.counts["glyphs"] += len(text)
+        self.target.text(text, x, y, wordwrap, scale, *args)
+
+    # Close the frame
+    def update(self):
+        peak = self.peak.get(self.scene)
+        if peak is None:
+            peak = {}
+            self.peak[self.scene] = peak
+            self.total[self.scene] = {}
+            self.scene_frames[self.scene] = 0
+        total = self.total[self.scene]
+        for name in Draw_cost_class.COUNTERS:
+            if self.counts[name] > peak.get(name, 0):
+                peak[name] = self.counts[name]
+            if self.counts[name] > 0:
+                total[name] = total.get(name, 0) + self.counts[name]
+        self.scene_frames[self.scene] += 1
+        self.frames += 1
+        self.reset()
+        self.target.update()
+
+    # Average counts per frame of a scene
+    def mean(self, scene):
+        frames = self.scene_frames.get(scene, 0)
+        if frames == 0:
+            return {}
+        return {name: count / frames for name, count in self.total[scene].items()}
+
+    # Other methods of the display
+    def __getattr__(self, name):
+        return getattr(self.target, name)
+
+########### END OF Draw_cost_class ###########
+
+'''
+# Replay a fixed game session for draw_cost_gate()
+#   cost  : Draw_cost_class instance, or None
+#   seed  : Random seed
+#   ships : Initial number of ships (-1: title, 0: game over)
+#   frames: Number of frames
+#   inputs: Button pattern list replayed frame by frame ("A": up, "B": down, "Y": fire)
+'''
+def draw_cost_session(cost, seed, ships, frames, inputs):
+    random.seed(seed)
+    enemy_ships = Enemy_ships_class()
+    battle_ship = Battle_ship_class(enemy_ships)
+    battle_ship.set_speed(3)
+    game_stage = Game_stage_class(battle_ship)
+    battle_ship.ships = 0
+    battle_ship.restart()
+    battle_ship.ships = ships
+    core1 = Multi_core_class(False)
+    if cost is not None:
+        cost.reset()
+
+    for i in range(frames):
+        keys = inputs[i % len(inputs)]
+        if "A" in keys:
+            battle_ship.move_rel(0, -1)
+        if "B" in keys:
+            battle_ship.move_rel(0,  1)
+        if "Y" in keys:
+            battle_ship.fire()
+
+        if cost is not None:
+            cost.scene = "PLAY" if battle_ship.ships > 0 else ("GAME_OVER" if battle_ship.ships == 0 else "TITLE")
+        draw_display(core1, game_stage, battle_ship, enemy_ships)
+
+'''
+# Draw cost regression gate
+#   Replays fixed sessions with the display counted by Draw_cost_class, and compares the peak and the mean
+#   counts per frame with DRAW_COST_BASELINES of DISPLAY_PROFILE and DRAW_COST_HEADROOM.
+#   Run this from REPL: asteroids_main.draw_cost_gate(), or on Linux with the headless modules: python -m pytest tests
+#   Return True if no count exceeds the baselines.
+'''
+def draw_cost_gate():
+    global display
+    screen = display
+    cost = Draw_cost_class(screen)
+    display = cost
+    try:
+        draw_cost_session(cost, 1, -1, 100, [""])
+        draw_cost_session(cost, 2, SHIPS_INIT, 300, ["AY", "A", "Y", "BY", "B", "Y"])
+        draw_cost_session(cost, 3, 0, 100, [""])
+    finally:
+        display = screen
+
+    passed = True
+    baselines = DRAW_COST_BASELINES[DISPLAY_PROFILE]
+    for scene in baselines:
+        for kind, counts in [("peak", cost.peak.get(scene, {})), ("mean", cost.mean(scene))]:
+            print(scene, kind, counts)
+            for name, base in baselines[scene][kind].items():
+                limit = -(-base * (100 + DRAW_COST_HEADROOM) // 100)       # Rounded up
+                if counts.get(name, 0) > limit:
+                    print("DRAW COST REGRESSION:", scene, kind, name, counts[name], ">", limit)
+                    passed = False
+
+    print("DRAW COST GATE:", "PASSED" if passed else "FAILED", "(" + str(cost.frames) + " frames)")
+    return passed
+
+'''
+# Benchmark of RAM and frame time for a display
+#   Sets up the display of the profile (full frame buffer, or the band renderer if band_height > 0),
+#   replays the sessions of draw_cost_gate() without counting, then restores the previous display.
+#   The frame time includes the 10 msec wait at the end of draw_display().
+#   buffer_bytes is the frame buffer or the buffers of the band renderer allocated for the display after the sessions,
+#   including its display list (display_list_bytes, for display_list_peak calls in a frame at most),
+#   heap_used is the heap used by the sessions (None without gc.mem_free).
+#   RETURN: dict of the results
+'''
+def display_benchmark(profile = DISPLAY_PICO_DISPLAY, band_height = 0, frames = 100):
+    profile_prev = DISPLAY_PROFILE
+    band_height_prev = BAND_HEIGHT
+    setup_display(profile, band_height)
+
+    gc.collect()
+    mem_start = mem_free()
+    res = {"display": LAYOUT["name"], "size": (WIDTH, HEIGHT), "band_height": BAND_HEIGHT, "buffer_bytes": DISPLAY_BUFFER_BYTES}
+    for scene, seed, ships, inputs in [("TITLE", 1, -1, [""]), ("PLAY", 2, SHIPS_INIT, ["AY", "A", "Y", "BY", "B", "Y"]), ("GAME_OVER", 3, 0, [""])]:
+        start = ticks_ms()
+        draw_cost_session(None, seed, ships, frames, inputs)
+        res[scene + "_ms"] = ticks_diff(ticks_ms(), start) / frames
+
+    mem_end = mem_free()
+    res["heap_used"] = None if mem_start is None else mem_start - mem_end
+    if BAND_HEIGHT > 0:
+        res["buffer_bytes"] = display.buffer_bytes()
+        res["display_list_bytes"] = display.display_list_bytes()
+        res["display_list_peak"] = display.n_peak
+    print("BENCHMARK:", res)
+
+    setup_display(profile_prev, band_height_prev)
+    return res
+
+'''
+# Benchmark of both displays with the full frame buffer and the band renderer
+#   bands: Number of the bands in a frame for the band renderer
+#   Run this from REPL: asteroids_main.display_benchmarks()
+#   RETURN: list of the results of display_benchmark()
+'''
+def display_benchmarks(bands = 5, frames = 100):
+    results = []
+    for profile in [DISPLAY_PICO_DISPLAY, DISPLAY_PICO_DISPLAY_2]:
+        results.append(display_benchmark(profile, 0, frames))
+        if framebuf is not None:
+            results.append(display_benchmark(profile, LAYOUTS[profile]["size"][1] // bands, frames))
+    return results
+
 '''
 ### MAIN ###
 '''
@@ -774,36 +2116,34 @@ if __name__=='__main__':
 
     game_stage = Game_stage_class(battle_ship)
     game_stage.clear(True)
-    
-    battle_ship.ships = -1
+
+    # Incidents before this boot
+    incident_log = Incident_log_class()
+    incident_log.load()
+    if machine.reset_cause() == machine.WDT_RESET:
+        incident_log.add(INCIDENT_WDT_RESET, "IDLE", 0, 0)
+    for incident in incident_log.incidents():
+        print("PREVIOUS INCIDENT:", incident)
+
+    # Resume the suspended game, or show the title
+    snapshot = Game_snapshot_class()
+    if snapshot.load(battle_ship, enemy_ships):
+        print("GAME RESUMED.")
+    else:
+        battle_ship.ships = -1
 
     # Prepare multi-core
     multi_core = Multi_core_class()
     if multi_core.get_status()["core1_on"]:
         print("CORE1 TURNED ON: ", multi_core.get_status())
-        multi_core.worker_set("GAME_DISPLAY", draw_display, (multi_core, game_stage, battle_ship, enemy_ships))
+        multi_core.worker_set("GAME_DISPLAY", draw_display, (multi_core, game_stage, battle_ship, enemy_ships, snapshot))
         multi_core.worker_start()
     else:
         print("MUTI-CORE TASK DOES NOT WORK.")
 
-    # Main-core event loop
-    while True:
-        # Move up the battle ship
-        if button_a.read():                                   # if a button press is detected then...
-            battle_ship.move_rel(0, -1)
-
-        # Move down the battle ship
-        if button_b.read():
-            battle_ship.move_rel(0,  1)
-
-        # Restart the game
-        if button_x.read():
-            if battle_ship.ships <= 0 or battle_ship.stage > FINAL_STAGE:
-                game_stage.clear(True)
-                battle_ship.restart()
+    # Stamp the button presses for the input latency
+    input_latency.attach()
 
-        # Fire a missile
-        if button_y.read():
-            battle_ship.fire()
-
-        time.sleep(0.02)
+    # Main-core event loop
+    main_core = Main_core_class(multi_core, game_stage, battle_ship, enemy_ships, snapshot, incident_log)
+    asyncio.run(main_core.run())
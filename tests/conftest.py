@@ -0,0 +1,16 @@
+import os
+import sys
+
+import pytest
+
+# The game runs on the headless modules instead of the Pico firmware modules
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "headless"))
+sys.path.insert(0, os.path.dirname(HERE))
+
+
+# The headless sessions do not wait for the frames and the banners
+@pytest.fixture(autouse=True)
+def no_sleep(monkeypatch):
+    import time
+    monkeypatch.setattr(time, "sleep", lambda seconds: None)
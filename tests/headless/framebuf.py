@@ -0,0 +1,104 @@
+'''''''''
+# Headless framebuf for the tests
+#   The formats and the methods used by the band renderer, in pure Python.
+'''''''''
+
+MONO_HLSB = 3
+RGB565 = 1
+GS4_HMSB = 2
+
+# 8x8 font: every character is a box
+_GLYPH = (0x7e, 0x42, 0x42, 0x42, 0x42, 0x42, 0x7e, 0x00)
+
+class FrameBuffer:
+    def __init__(self, buf, width, height, format):
+        self.buf = buf
+        self.width = width
+        self.height = height
+        self.format = format
+
+    def pixel(self, x, y, c = None):
+        if x < 0 or x >= self.width or y < 0 or y >= self.height:
+            return None
+        if c is None:
+            return self.get(x, y)
+        if self.format == RGB565:
+            i = (y * self.width + x) * 2
+            self.buf[i] = c & 0xff
+            self.buf[i + 1] = (c >> 8) & 0xff
+        elif self.format == GS4_HMSB:
+            i = (y * self.width + x) >> 1
+            if x & 1:
+                self.buf[i] = (self.buf[i] & 0xf0) | (c & 0x0f)
+            else:
+                self.buf[i] = (self.buf[i] & 0x0f) | ((c & 0x0f) << 4)
+        else:
+            i = (y * self.width + x) >> 3
+            bit = 0x80 >> (x & 7)
+            self.buf[i] = (self.buf[i] | bit) if c else (self.buf[i] & ~bit)
+
+    def get(self, x, y):
+        if self.format == RGB565:
+            i = (y * self.width + x) * 2
+            return self.buf[i] | (self.buf[i + 1] << 8)
+        if self.format == GS4_HMSB:
+            b = self.buf[(y * self.width + x) >> 1]
+            return (b & 0x0f) if x & 1 else (b >> 4)
+        return 1 if self.buf[(y * self.width + x) >> 3] & (0x80 >> (x & 7)) else 0
+
+    def fill(self, c):
+        if self.format == RGB565:
+            self.buf[:] = bytes([c & 0xff, (c >> 8) & 0xff]) * (len(self.buf) // 2)
+        elif self.format == GS4_HMSB:
+            self.buf[:] = bytes([((c & 0x0f) << 4) | (c & 0x0f)]) * len(self.buf)
+        else:
+            self.buf[:] = bytes([0xff if c else 0]) * len(self.buf)
+
+    def hline(self, x, y, w, c):
+        for px in range(max(x, 0), min(x + w, self.width)):
+            self.pixel(px, y, c)
+
+    def fill_rect(self, x, y, w, h, c):
+        for py in range(max(y, 0), min(y + h, self.height)):
+            self.hline(x, py, w, c)
+
+    def ellipse(self, x, y, xr, yr, c, f = False):
+        for dy in range(-yr, yr + 1):
+            for dx in range(-xr, xr + 1):
+                if dx * dx * yr * yr + dy * dy * xr * xr <= xr * xr * yr * yr:
+                    if f or dx * dx * yr * yr + dy * dy * xr * xr > (xr - 1) * (xr - 1) * yr * yr:
+                        self.pixel(x + dx, y + dy, c)
+
+    def poly(self, x, y, coords, c, f = False):
+        xs = coords[0::2]
+        ys = coords[1::2]
+        for py in range(max(min(ys) + y, 0), min(max(ys) + y + 1, self.height)):
+            for px in range(max(min(xs) + x, 0), min(max(xs) + x + 1, self.width)):
+                if self._inside(px - x, py - y, xs, ys):
+                    self.pixel(px, py, c)
+
+    def _inside(self, px, py, xs, ys):
+        inside = False
+        j = len(xs) - 1
+        for i in range(len(xs)):
+            if (ys[i] > py) != (ys[j] > py) and px < (xs[j] - xs[i]) * (py - ys[i]) / (ys[j] - ys[i]) + xs[i]:
+                inside = not inside
+            j = i
+        return inside
+
+    def blit(self, fbuf, x, y, key = -1, palette = None):
+        for sy in range(max(0, -y), min(fbuf.height, self.height - y)):
+            for sx in range(max(0, -x), min(fbuf.width, self.width - x)):
+                c = fbuf.get(sx, sy)
+                if c == key:
+                    continue
+                if palette is not None:
+                    c = palette.get(c, 0)
+                self.pixel(x + sx, y + sy, c)
+
+    def text(self, s, x, y, c = 1):
+        for n in range(len(s)):
+            for row in range(8):
+                for col in range(8):
+                    if _GLYPH[row] & (0x80 >> col):
+                        self.pixel(x + n * 8 + col, y + row, c)
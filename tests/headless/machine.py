@@ -0,0 +1,54 @@
+'''''''''
+# Headless machine for the tests
+'''''''''
+
+WDT_RESET = 3
+
+def freq(hz = None):
+    return 240000000
+
+def reset_cause():
+    return 0
+
+class WDT:
+    def __init__(self, timeout = 5000):
+        self.timeout = timeout
+
+    def feed(self):
+        pass
+
+class Pin:
+    IN = 0
+    OUT = 1
+    PULL_UP = 1
+    IRQ_FALLING = 4
+
+    def __init__(self, id, mode = None, pull = None, value = None):
+        self.id = id
+        self.level = value
+        self.handler = None
+
+    def irq(self, handler = None, trigger = IRQ_FALLING):
+        self.handler = handler
+
+    def value(self, level = None):
+        if level is None:
+            return self.level
+        self.level = level
+
+class SPI:
+    def __init__(self, id, baudrate = 1000000, sck = None, mosi = None):
+        self.written = 0
+
+    def write(self, buf):
+        self.written += len(buf)
+
+class PWM:
+    def __init__(self, pin):
+        self.pin = pin
+
+    def freq(self, hz):
+        pass
+
+    def duty_u16(self, duty):
+        pass
@@ -0,0 +1,61 @@
+'''''''''
+# Headless picographics for the tests
+#   Same interface as PicoGraphics used by the game, drawing nothing.
+'''''''''
+
+DISPLAY_PICO_DISPLAY = 0
+DISPLAY_PICO_DISPLAY_2 = 1
+PEN_P4 = 4
+
+def get_buffer_size(display, pen_type):
+    width, height = (240, 135) if display == DISPLAY_PICO_DISPLAY else (320, 240)
+    return width * height // 2
+
+class PicoGraphics:
+    def __init__(self, display = DISPLAY_PICO_DISPLAY, pen_type = PEN_P4, rotate = 0, buffer = None):
+        self.width, self.height = (240, 135) if display == DISPLAY_PICO_DISPLAY else (320, 240)
+        self.buffer = buffer
+        self.pens = 0
+
+    def get_bounds(self):
+        return self.width, self.height
+
+    def set_backlight(self, brightness):
+        pass
+
+    def set_font(self, font):
+        pass
+
+    def create_pen(self, r, g, b):
+        self.pens += 1
+        return self.pens - 1
+
+    def set_pen(self, pen):
+        pass
+
+    def clear(self):
+        pass
+
+    def update(self):
+        pass
+
+    def pixel(self, x, y):
+        pass
+
+    def pixel_span(self, x, y, l):
+        pass
+
+    def rectangle(self, x, y, w, h):
+        pass
+
+    def circle(self, x, y, r):
+        pass
+
+    def triangle(self, x1, y1, x2, y2, x3, y3):
+        pass
+
+    def text(self, text, x, y, wordwrap = 0, scale = 1, *args):
+        pass
+
+    def measure_text(self, text, scale = 1, *args):
+        return len(text) * 6 * scale
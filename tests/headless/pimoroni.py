@@ -0,0 +1,39 @@
+'''''''''
+# Headless pimoroni for the tests
+#   Button.read() has the semantics of Pimoroni's Button: True on the press, then once in every repeat_time
+#   while the button is held.  Tests set the level with press() and release().
+'''''''''
+
+import time
+
+class Button:
+    def __init__(self, pin, invert = True, repeat_time = 200, hold_time = 1000):
+        self.pin = pin
+        self.repeat_time = repeat_time
+        self.hold_time = hold_time
+        self.level = False
+        self.last_state = False
+        self.last_time = 0
+
+    def press(self):
+        self.level = True
+
+    def release(self):
+        self.level = False
+
+    def raw(self):
+        return self.level
+
+    def read(self):
+        now = int(time.monotonic() * 1000)
+        state = self.raw()
+        if state != self.last_state:
+            self.last_state = state
+            self.last_time = now
+            return state
+
+        if state and self.repeat_time > 0 and now - self.last_time >= self.repeat_time:
+            self.last_time = now
+            return True
+
+        return False
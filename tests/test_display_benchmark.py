@@ -0,0 +1,96 @@
+import framebuf
+
+import asteroids_main
+
+
+class Capture_sink:
+    def __init__(self, width, height):
+        self.buf = bytearray(width * height // 2)
+        self.fb = framebuf.FrameBuffer(self.buf, width, height, framebuf.GS4_HMSB)
+
+    def write(self, y, h, band):
+        self.fb.blit(band, 0, y)
+
+
+# Records the same calls in two displays
+class Tee:
+    def __init__(self, first, second, frames):
+        self.first = first
+        self.second = second
+        self.frames = frames
+
+    def update(self):
+        self.first.update()
+        self.second.update()
+        self.frames.append((bytes(self.first.sink.buf), bytes(self.second.sink.buf)))
+
+    def __getattr__(self, name):
+        def call(*args):
+            getattr(self.second, name)(*args)
+            return getattr(self.first, name)(*args)
+        return call
+
+
+def band_renderers(profile):
+    asteroids_main.setup_display(profile, asteroids_main.LAYOUTS[profile]["size"][1] // 5)
+    band = asteroids_main.display
+    full = asteroids_main.Band_renderer_class(band.width, band.height, band.height, band.sink)
+    full.palette = band.palette
+    full.background = band.background
+    band.sink = Capture_sink(band.width, band.height)
+    full.sink = Capture_sink(band.width, band.height)
+    return band, full
+
+
+def test_display_benchmark_band_renderer_saves_frame_buffer():
+    profile = asteroids_main.DISPLAY_PROFILE
+    for display in [asteroids_main.DISPLAY_PICO_DISPLAY, asteroids_main.DISPLAY_PICO_DISPLAY_2]:
+        full = asteroids_main.display_benchmark(display, 0, 2)
+        band = asteroids_main.display_benchmark(display, asteroids_main.LAYOUTS[display]["size"][1] // 5, 2)
+
+        assert full["size"] == asteroids_main.LAYOUTS[display]["size"]
+        assert band["display_list_peak"] > 0
+        assert band["display_list_bytes"] < band["buffer_bytes"] < full["buffer_bytes"] // 2
+
+    assert asteroids_main.DISPLAY_PROFILE == profile
+    assert asteroids_main.BAND_HEIGHT == 0
+
+
+def test_band_composition_matches_full_frame(monkeypatch):
+    for profile in [asteroids_main.DISPLAY_PICO_DISPLAY, asteroids_main.DISPLAY_PICO_DISPLAY_2]:
+        band, full = band_renderers(profile)
+        frames = []
+        monkeypatch.setattr(asteroids_main, "display", Tee(band, full, frames))
+        asteroids_main.draw_cost_session(None, 1, -1, 2, [""])
+        asteroids_main.draw_cost_session(None, 2, asteroids_main.SHIPS_INIT, 6, ["AY", "A", "Y"])
+
+        blank = bytes([band.background * 0x11]) * len(frames[0][0])
+        for band_frame, full_frame in frames:
+            assert band_frame == full_frame
+        assert frames[0][0] != blank and frames[-1][0] != blank
+
+    asteroids_main.setup_display(asteroids_main.DISPLAY_PICO_DISPLAY)
+
+
+def test_band_renderer_keeps_the_scene_under_a_banner():
+    band, full = band_renderers(asteroids_main.DISPLAY_PICO_DISPLAY)
+    band.set_pen(asteroids_main.BLACK)
+    band.clear()
+    band.set_pen(asteroids_main.RED)
+    band.circle(20, 100, 5)
+    band.update()
+    scene = bytes(band.sink.buf)
+
+    band.keep_scene()
+    band.set_pen(asteroids_main.CYAN)
+    band.text("STAGE CLR...", 55, 10, 240, 2)
+    band.update()
+    assert band.sink.fb.pixel(20, 100) == asteroids_main.RED
+    assert bytes(band.sink.buf) != scene
+
+    band.set_pen(asteroids_main.BLACK)
+    band.clear()
+    band.update()
+    assert band.sink.fb.pixel(20, 100) == asteroids_main.BLACK
+
+    asteroids_main.setup_display(asteroids_main.DISPLAY_PICO_DISPLAY)
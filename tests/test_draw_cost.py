@@ -0,0 +1,43 @@
+import asteroids_main
+
+
+def test_draw_cost_counts_a_frame():
+    cost = asteroids_main.Draw_cost_class(asteroids_main.display)
+    cost.scene = "TEST"
+    cost.set_pen(asteroids_main.WHITE)
+    cost.set_pen(asteroids_main.WHITE)
+    cost.pixel(1, 1)
+    cost.pixel_span(0, 2, 10)
+    cost.rectangle(0, 0, 4, 5)
+    cost.set_pen(asteroids_main.BLACK)
+    cost.text("ABC", 0, 0, 240, 2)
+    cost.update()
+
+    peak = cost.peak["TEST"]
+    assert peak["set_pen"] == 2
+    assert peak["pixel"] == 1
+    assert peak["pixel_span"] == 1
+    assert peak["rectangle"] == 1
+    assert peak["text"] == 1
+    assert peak["glyphs"] == 3
+    assert peak["pixels"] == 1 + 10 + 20 + 3 * 48 * 4
+    assert cost.mean("TEST")["pixels"] == peak["pixels"]
+    assert cost.counts["pixels"] == 0
+
+
+def test_draw_cost_gate():
+    assert asteroids_main.draw_cost_gate()
+
+
+def test_draw_cost_gate_fails_over_baseline(monkeypatch):
+    baselines = dict(asteroids_main.DRAW_COST_BASELINES)
+    profile = dict(baselines[asteroids_main.DISPLAY_PROFILE])
+    profile["TITLE"] = dict(profile["TITLE"], peak=dict(profile["TITLE"]["peak"], text=0))
+    baselines[asteroids_main.DISPLAY_PROFILE] = profile
+    monkeypatch.setattr(asteroids_main, "DRAW_COST_BASELINES", baselines)
+    assert not asteroids_main.draw_cost_gate()
+
+
+def test_draw_cost_gate_fails_on_full_redraw(monkeypatch):
+    monkeypatch.setattr(asteroids_main, "FULL_REDRAW", True)
+    assert not asteroids_main.draw_cost_gate()
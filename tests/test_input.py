@@ -0,0 +1,65 @@
+import pytest
+
+import asteroids_main
+
+
+@pytest.fixture
+def main_core():
+    enemy_ships = asteroids_main.Enemy_ships_class()
+    battle_ship = asteroids_main.Battle_ship_class(enemy_ships)
+    game_stage = asteroids_main.Game_stage_class(battle_ship)
+    snapshot = asteroids_main.Game_snapshot_class()
+    yield asteroids_main.Main_core_class(None, game_stage, battle_ship, enemy_ships, snapshot, None)
+    for button in [asteroids_main.button_a, asteroids_main.button_b, asteroids_main.button_x, asteroids_main.button_y]:
+        button.release()
+        button.read()
+
+
+def test_x_restarts_from_title(main_core):
+    main_core.battle_ship.ships = -1
+    asteroids_main.button_x.press()
+    main_core.poll_input()
+
+    assert main_core.battle_ship.ships == asteroids_main.SHIPS_INIT
+    assert main_core.remove_request
+    assert not main_core.snapshot.save_request
+
+
+def test_x_and_y_save_once(main_core):
+    main_core.battle_ship.ships = 2
+    asteroids_main.button_y.press()
+    main_core.poll_input()
+    asteroids_main.button_x.press()
+    main_core.poll_input()
+
+    assert main_core.snapshot.save_request
+    assert main_core.battle_ship.ships == 2
+    assert not main_core.remove_request
+
+    main_core.snapshot.save_request = False
+    main_core.poll_input()
+    assert not main_core.snapshot.save_request
+
+
+def test_latency_is_measured_from_the_edge(main_core, monkeypatch):
+    latency = asteroids_main.Input_latency_class()
+    monkeypatch.setattr(asteroids_main, "input_latency", latency)
+    main_core.battle_ship.display = True
+
+    # The IRQ stamps the falling edge 15 msec before the poll
+    latency.edge_handler(0)(None)
+    latency.edges[0] -= 15
+    asteroids_main.button_a.press()
+    main_core.poll_input()
+    latency.drawn()
+    latency.shown()
+
+    assert latency.count[0] == 1
+    assert latency.total[0] >= 15
+    assert latency.edges[0] == -1
+
+
+def test_stale_edge_is_not_used():
+    latency = asteroids_main.Input_latency_class()
+    latency.edges[2] = asteroids_main.ticks_ms() - 1000
+    assert asteroids_main.ticks_diff(asteroids_main.ticks_ms(), latency.edge(2)) < 100
@@ -0,0 +1,53 @@
+import asteroids_main
+
+
+def new_game():
+    enemy_ships = asteroids_main.Enemy_ships_class()
+    battle_ship = asteroids_main.Battle_ship_class(enemy_ships)
+    battle_ship.ships = 0
+    battle_ship.restart()
+    return battle_ship, enemy_ships
+
+
+def test_snapshot_round_trip(tmp_path):
+    snapshot = asteroids_main.Game_snapshot_class(str(tmp_path / "game.sav"))
+    battle_ship, enemy_ships = new_game()
+    battle_ship.stage = 4
+    battle_ship.score = 1234
+    snapshot.save_request = True
+    snapshot.frame_end(battle_ship, enemy_ships)
+    assert snapshot.write()
+
+    battle_ship, enemy_ships = new_game()
+    assert snapshot.load(battle_ship, enemy_ships)
+    assert battle_ship.stage == 4
+    assert battle_ship.score == 1234
+
+
+def test_broken_snapshot_is_removed(tmp_path):
+    path = tmp_path / "game.sav"
+    snapshot = asteroids_main.Game_snapshot_class(str(path))
+    battle_ship, enemy_ships = new_game()
+    snapshot.save_request = True
+    snapshot.frame_end(battle_ship, enemy_ships)
+    snapshot.write()
+
+    data = bytearray(path.read_bytes())
+    data[snapshot.header_size + 1] = 7              # Enemy model out of range
+    path.write_bytes(bytes(data))
+
+    assert not snapshot.load(*new_game())
+    assert not path.exists()
+    assert not snapshot.stored
+
+
+def test_out_of_range_snapshot_with_valid_crc_is_removed(tmp_path):
+    path = tmp_path / "game.sav"
+    snapshot = asteroids_main.Game_snapshot_class(str(path))
+    battle_ship, enemy_ships = new_game()
+    battle_ship.stage = asteroids_main.FINAL_STAGE + 1
+    snapshot.pack(battle_ship, enemy_ships)
+    path.write_bytes(bytes(snapshot.buf))
+
+    assert not snapshot.load(*new_game())
+    assert not path.exists()